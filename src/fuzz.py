@@ -0,0 +1,382 @@
+"""
+Differential fuzz harness comparing an alternative engine against `PingPong`
+
+Both engines are driven with the same command sequence and seed, and their
+states are compared after every frame. A failing sequence is shrunk to a
+minimal repro before it is reported.
+
+    python -m src.fuzz --engine my_pkg.fast_game:FastPingPong --cases 100000 --jobs 8
+
+Most of the time goes to running the reference engine itself, at about 12000
+frames per second on one core. Comparing it with itself covers 35 to 40 cases
+per second per core, so a million cases take 7 to 8 core-hours.
+
+An alternative engine is constructed with the same arguments as `PingPong`
+and should either keep the same attributes or provide a `fuzz_state()`
+method returning the tuple described by `STATE_FIELDS`.
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+# Keep stdout for the repros only
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from mlgame.utils.enum import get_ai_name
+
+from .game import PingPong
+from .game_object import PlatformAction
+
+_AI_1P = get_ai_name(0)
+_AI_2P = get_ai_name(1)
+
+# Invalid commands are mapped to `PlatformAction.NONE` by the engine
+COMMANDS = tuple(PlatformAction.__members__) + ("", "INVALID")
+DIFFICULTIES = ("EASY", "NORMAL", "HARD")
+
+STATE_FIELDS = (
+    "update_result", "frame", "ball_served", "ball_served_frame", "score", "status",
+    "ball", "ball_last_pos", "ball_speed", "serve_from_1P",
+    "platform_1P", "platform_1P_speed", "platform_2P", "platform_2P_speed",
+    "blocker", "blocker_speed",
+)
+
+
+def game_state(game) -> tuple:
+    """
+    Get everything `update()` and `reset()` can change, in `STATE_FIELDS` order
+    (without the leading `update_result`)
+    """
+    if hasattr(game, "fuzz_state"):
+        return tuple(game.fuzz_state())
+
+    return (
+        game._frame_count,
+        game._ball_served,
+        game._ball_served_frame,
+        tuple(game._score),
+        str(game._game_status),
+        tuple(game._ball.rect),
+        tuple(game._ball.last_pos),
+        game._ball.speed,
+        game._ball.serve_from_1P,
+        tuple(game._platform_1P.rect),
+        tuple(game._platform_1P._speed),
+        tuple(game._platform_2P.rect),
+        tuple(game._platform_2P._speed),
+        tuple(game._blocker.rect),
+        tuple(game._blocker._speed),
+    )
+
+
+def load_engine(spec: str):
+    """
+    Import the engine class from a "package.module:ClassName" string
+    """
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name or "PingPong")
+
+
+def _new_game(engine_cls, seed, params):
+    random.seed(seed)
+    return engine_cls(**params)
+
+
+def _step(game, cmds):
+    """
+    Run one frame, resetting the game the way mlgame does
+
+    @return `(result, state)`, where `state` starts with `result`
+    """
+    try:
+        result = game.update({_AI_1P: cmds[0], _AI_2P: cmds[1]})
+        if result == "RESET":
+            game.reset()
+        return result, (result,) + game_state(game)
+    except Exception as e:
+        return "QUIT", ("EXCEPTION", "{}: {}".format(type(e).__name__, e))
+
+
+def _diff(ref_state, alt_state) -> dict:
+    if len(ref_state) != len(alt_state):
+        return {"state": (repr(ref_state), repr(alt_state))}
+
+    return {name: (repr(ref), repr(alt))
+            for name, ref, alt in zip(STATE_FIELDS, ref_state, alt_state) if ref != alt}
+
+
+def _compare(engine_cls, seed, params, commands, ref_states):
+    alt = _new_game(engine_cls, seed, params)
+    for frame, (cmds, ref_state) in enumerate(zip(commands, ref_states), 1):
+        alt_state = _step(alt, cmds)[1]
+        if alt_state != ref_state:
+            return frame, _diff(ref_state, alt_state)
+
+    return None
+
+
+def run_case(engine_cls, seed, params, commands):
+    """
+    Replay `commands` on both engines
+
+    @return `(frame, diff)` of the first diverging frame, or None if both engines agree.
+    """
+    ref = _new_game(PingPong, seed, params)
+    ref_states = []
+    for cmds in commands:
+        result, state = _step(ref, cmds)
+        ref_states.append(state)
+        if result == "QUIT":
+            break
+
+    return _compare(engine_cls, seed, params, commands, ref_states)
+
+
+def _reflect(x, low, high):
+    """
+    Fold `x` into [low, high] as if it bounced off both ends
+    """
+    span = high - low
+    x = (x - low) % (2 * span)
+    return low + (2 * span - x if x > span else x)
+
+
+class _CommandSource:
+    """
+    Random commands for one side, mixing held random actions with chasing the
+    predicted landing spot of the ball, so that some rallies last long enough
+    to reach the draw speed
+    """
+
+    def __init__(self, rng: random.Random, side_index):
+        self._rng = rng
+        self._side_index = side_index
+        self._chase_rate = rng.choice((0.5, 0.9, 1.0))
+        self._cmd = "NONE"
+        self._offset = 15
+        self._hold = 0
+
+    def next(self, game):
+        if self._hold <= 0:
+            self._hold = self._rng.choice((1, 2, 5, 20, 60, 200))
+            self._cmd = ("CHASE" if self._rng.random() < self._chase_rate
+                         else self._rng.choice(COMMANDS))
+            # Catch the ball with a random spot of the platform to hit the corners as well
+            self._offset = self._rng.choice((15, self._rng.randrange(-9, 40)))
+        self._hold -= 1
+
+        if self._cmd != "CHASE":
+            return self._cmd
+        if not game._ball_served:
+            return self._rng.choice(COMMANDS)
+
+        ball = game._ball
+        speed_x, speed_y = ball.speed
+        top_y = game._platform_2P.rect.bottom
+        bottom_y = game._platform_1P.rect.top - ball.rect.height
+        if self._side_index == 0:
+            platform = game._platform_1P
+            coming = speed_y > 0
+            # Assume the ball comes back from the other side without being sliced
+            distance_y = bottom_y - ball.rect.y if coming else (ball.rect.y - top_y) + (bottom_y - top_y)
+        else:
+            platform = game._platform_2P
+            coming = speed_y < 0
+            distance_y = ball.rect.y - top_y if coming else (bottom_y - ball.rect.y) + (bottom_y - top_y)
+
+        area = ball._play_area_rect
+        target_x = _reflect(ball.rect.x + speed_x * distance_y / abs(speed_y),
+                            area.left, area.right - ball.rect.width) - self._offset
+
+        if platform.rect.x < target_x - 2:
+            return "MOVE_RIGHT"
+        if platform.rect.x > target_x + 2:
+            return "MOVE_LEFT"
+        return "NONE"
+
+
+def make_case(seed, max_frames, engine_cls=None):
+    """
+    Generate the parameters and the command sequence of the case `seed`
+
+    The commands are generated while playing the reference engine, so the
+    recorded sequence can be replayed without it. If `engine_cls` is given,
+    it is then compared with the reference frame by frame.
+
+    @return `(params, commands, divergence)`, see `run_case()` for `divergence`
+    """
+    rng = random.Random(seed)
+    params = {
+        "difficulty": rng.choice(DIFFICULTIES),
+        "game_over_score": rng.randint(1, 3),
+        # The platforms can't keep up with fast balls for long, so the draw is mostly reached
+        # right after serving, or after a speed-up or two when starting just below it
+        "init_vel": rng.choice((1, 7, rng.randint(1, 40), 39, 40, 40, 41, 42)),
+    }
+    sources = (_CommandSource(rng, 0), _CommandSource(rng, 1))
+
+    ref = _new_game(PingPong, seed, params)
+    commands = []
+    ref_states = []
+    for _ in range(rng.randint(1, max_frames)):
+        cmds = tuple(source.next(ref) for source in sources)
+        commands.append(cmds)
+        result, state = _step(ref, cmds)
+        ref_states.append(state)
+        if result == "QUIT":
+            break
+
+    divergence = _compare(engine_cls, seed, params, commands, ref_states) if engine_cls else None
+    return params, commands, divergence
+
+
+def shrink(engine_cls, seed, params, commands, divergence):
+    """
+    Shrink a failing command sequence by removing chunks of frames and by
+    replacing commands with "NONE", as long as the engines still diverge
+    """
+    commands = commands[:divergence[0]]
+
+    def attempt(candidate):
+        nonlocal commands, divergence
+        result = run_case(engine_cls, seed, params, candidate)
+        if result is None:
+            return False
+        commands, divergence = candidate[:result[0]], result
+        return True
+
+    chunk = len(commands) // 2
+    while chunk >= 1:
+        start = 0
+        while start < len(commands):
+            if not attempt(commands[:start] + commands[start + chunk:]):
+                start += chunk
+        chunk //= 2
+
+    for i in range(len(commands)):
+        if i < len(commands) and commands[i] != ("NONE", "NONE"):
+            attempt(commands[:i] + [("NONE", "NONE")] + commands[i + 1:])
+
+    return commands, divergence
+
+
+def _silence_stdout():
+    # The games print the result of every round
+    sys.stdout = open(os.devnull, "w")
+
+
+def _fuzz_batch(engine_spec, seeds, max_frames, max_failures):
+    engine_cls = load_engine(engine_spec)
+    failures = []
+    count = 0
+    for count, seed in enumerate(seeds, 1):
+        params, commands, divergence = make_case(seed, max_frames, engine_cls)
+        if divergence is None:
+            continue
+        failures.append({
+            "engine": engine_spec,
+            "seed": seed,
+            "params": params,
+            "commands": commands[:divergence[0]],
+            "frame": divergence[0],
+            "diff": divergence[1],
+        })
+        if len(failures) >= max_failures:
+            break
+
+    return count, failures
+
+
+def _fuzz_batch_star(args):
+    return _fuzz_batch(*args)
+
+
+def _shrink_failure(failure: dict) -> dict:
+    commands, (frame, diff) = shrink(load_engine(failure["engine"]), failure["seed"], failure["params"],
+                                     failure["commands"], (failure["frame"], failure["diff"]))
+    return dict(failure, commands=commands, frame=frame, diff=diff)
+
+
+def fuzz(engine_spec, cases, seed=0, jobs=None, max_frames=1000, batch_size=50, max_failures=10):
+    """
+    Run `cases` random cases across `jobs` processes, and stop at `max_failures` failures
+
+    @return A list of shrunk repros, at most `max_failures` of them
+    """
+    batches = [(engine_spec, range(start, min(start + batch_size, seed + cases)), max_frames, max_failures)
+               for start in range(seed, seed + cases, batch_size)]
+    failures = []
+    done = 0
+    begin = time.time()
+
+    with multiprocessing.Pool(jobs or os.cpu_count(), initializer=_silence_stdout) as pool:
+        for count, batch_failures in pool.imap_unordered(_fuzz_batch_star, batches):
+            done += count
+            failures.extend(batch_failures)
+            print("\r{}/{} cases, {} failures, {:.0f}s".format(
+                done, cases, len(failures), time.time() - begin), end="", flush=True, file=sys.stderr)
+            if len(failures) >= max_failures:
+                break
+    print(file=sys.stderr)
+
+    # Shrinking replays a case many times, so only shrink the reported ones
+    failures = failures[:max_failures]
+    if not failures:
+        return failures
+    with multiprocessing.Pool(min(jobs or os.cpu_count(), len(failures)), initializer=_silence_stdout) as pool:
+        return pool.map(_shrink_failure, failures)
+
+
+def replay(repro: dict):
+    """
+    Rerun a repro printed by `fuzz()`
+
+    @return `(frame, diff)` of the first diverging frame, or None if it no longer fails
+    """
+    return run_case(load_engine(repro["engine"]), repro["seed"], repro["params"],
+                    [tuple(cmds) for cmds in repro["commands"]])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--engine", default="src.game:PingPong",
+                        help="The engine to check, as \"package.module:ClassName\" [default: %(default)s]")
+    parser.add_argument("--cases", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the first case")
+    parser.add_argument("--jobs", type=int, default=None, help="[default: number of cores]")
+    parser.add_argument("--max-frames", type=int, default=1000)
+    parser.add_argument("--max-failures", type=int, default=10)
+    parser.add_argument("--replay", help="Rerun the repros in a JSON lines file instead of fuzzing")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        with open(args.replay) as f:
+            for line in f:
+                # Skip anything else saved along with the repros
+                try:
+                    repro = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(repro, dict):
+                    continue
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    divergence = replay(repro)
+                print("seed {}: {}".format(repro["seed"], divergence or "OK"))
+        return
+
+    failures = fuzz(args.engine, args.cases, args.seed, args.jobs,
+                    args.max_frames, max_failures=args.max_failures)
+    for failure in failures:
+        print(json.dumps(failure, ensure_ascii=False))
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from .env import BOARD1P_PATH, BALL_PATH, OBSTACLE_PATH, BOARD2P_PATH, BOARD1P_U
 from .game_object import (
     Ball, Blocker, Platform, PlatformAction, SERVE_BALL_ACTIONS
 )
+from .history import ObservationHistory
 from .utils import shift_left_with_bg_width
 
 DRAW_BALL_SPEED = 40
@@ -19,7 +20,8 @@ DRAW_BALL_SPEED = 40
 
 class PingPong(PaiaGame):
 
-    def __init__(self, difficulty, game_over_score, user_num=2, init_vel=7, *args, **kwargs):
+    def __init__(self, difficulty, game_over_score, user_num=2, init_vel=7, history_len=0, fast_forward=0,
+                 *args, **kwargs):
         super().__init__(user_num=user_num)
         self._difficulty = difficulty
         self._score = [0, 0]
@@ -29,6 +31,13 @@ class PingPong(PaiaGame):
         self._ball_served = False
         self._ball_served_frame = 0
         self._init_vel = init_vel
+        # Keep the last `history_len` observations for the players, if enabled
+        self._history = ObservationHistory(history_len) if history_len > 0 else None
+        # Replay the outcome of a rally starting from an already seen state,
+        # assuming that both agents are deterministic between two resets.
+        self._fast_forward = bool(fast_forward)
+        self._rally_outcomes = {}
+        self._rally_key = None
         self.scene = Scene(width=1000, height=500, color="#73A343", bias_x=0, bias_y=0)
         self._create_init_scene()
 
@@ -59,17 +68,21 @@ class PingPong(PaiaGame):
         command_2P = (PlatformAction(ai_2p_cmd)
                       if ai_2p_cmd in PlatformAction.__members__ else PlatformAction.NONE)
 
-        self._frame_count += 1
-        self._platform_1P.move(command_1P)
-        self._platform_2P.move(command_2P)
-        self._blocker.move()
+        if not self._skip_repeated_rally(command_1P, command_2P):
+            self._frame_count += 1
+            self._platform_1P.move(command_1P)
+            self._platform_2P.move(command_2P)
+            self._blocker.move()
 
-        if not self._ball_served:
-            self._wait_for_serving_ball(command_1P, command_2P)
-        else:
-            self._ball_moving()
+            if not self._ball_served:
+                self._wait_for_serving_ball(command_1P, command_2P)
+            else:
+                self._ball_moving()
 
         if self.get_game_status() != GameStatus.GAME_ALIVE:
+            if self._rally_key is not None:
+                self._rally_outcomes[self._rally_key] = self._get_rally_state()
+                self._rally_key = None
             if self._game_over(self.get_game_status()):
                 self._print_result()
                 self._game_status = GameStatus.GAME_OVER
@@ -118,6 +131,8 @@ class PingPong(PaiaGame):
         if (self._frame_count >= 150 and
                 target_action not in SERVE_BALL_ACTIONS):
             target_action = random.choice(SERVE_BALL_ACTIONS)
+            # The outcome of this rally can't be replayed
+            self._rally_key = None
 
         if target_action in SERVE_BALL_ACTIONS:
             self._ball.serve(target_action)
@@ -133,6 +148,57 @@ class PingPong(PaiaGame):
         self._ball.move()
         self._ball.check_bouncing(self._platform_1P, self._platform_2P, self._blocker)
 
+    def _skip_repeated_rally(self, action_1P: PlatformAction, action_2P: PlatformAction):
+        """
+        Jump to the end of the rally if the same rally was played before
+
+        The ball speeds up every 100 frames, so the state never repeats within a rally,
+        but every rally starts from the reset state. With deterministic agents,
+        a rally starting from a seen state with the same commands ends the same way.
+        The skipped rally uses no random numbers, so the following rallies are not affected.
+
+        @return True if the rally is skipped
+        """
+        if not self._fast_forward or self._frame_count != 0:
+            return False
+
+        self._rally_key = self._get_rally_state() + (action_1P, action_2P)
+        outcome = self._rally_outcomes.get(self._rally_key)
+        if outcome is None:
+            return False
+
+        self._set_rally_state(outcome)
+        self._rally_key = None
+        return True
+
+    def _get_rally_state(self) -> tuple:
+        # The last position of the ball and the speed of the platforms are left
+        # from the previous rally, and are overwritten before being used.
+        state = (
+            self._frame_count,
+            self._ball_served,
+            self._ball_served_frame,
+            self._ball.serve_from_1P,
+            self._ball.rect.topleft,
+            self._ball.speed,
+            self._platform_1P.rect.topleft,
+            self._platform_2P.rect.topleft,
+        )
+        if self._difficulty == "HARD":
+            # Otherwise the blocker is out of the play area and can't affect the rally
+            state += (self._blocker.rect.topleft, tuple(self._blocker._speed))
+
+        return state
+
+    def _set_rally_state(self, state: tuple):
+        (self._frame_count, self._ball_served, self._ball_served_frame,
+         self._ball.serve_from_1P, self._ball.rect.topleft, ball_speed,
+         self._platform_1P.rect.topleft, self._platform_2P.rect.topleft) = state[:8]
+        self._ball._speed = list(ball_speed)
+        if self._difficulty == "HARD":
+            self._blocker.rect.topleft, blocker_speed = state[8:]
+            self._blocker._speed = list(blocker_speed)
+
     def get_data_from_game_to_player(self) -> dict:
         to_players_data = {}
         scene_info = {
@@ -148,8 +214,14 @@ class PingPong(PaiaGame):
 
         if self._difficulty == "HARD":
             scene_info["blocker"] = shift_left_with_bg_width(self._blocker.pos)
+            blocker_speed = self._blocker._speed
         else:
             scene_info["blocker"] = (0, 0)
+            blocker_speed = (0, 0)
+
+        if self._history is not None:
+            self._history.push(scene_info, blocker_speed)
+            scene_info["history"] = self._history.view()
 
         to_players_data[get_ai_name(0)] = scene_info
         to_players_data[get_ai_name(1)] = scene_info
@@ -178,6 +250,8 @@ class PingPong(PaiaGame):
         self._platform_1P.reset()
         self._platform_2P.reset()
         self._blocker.reset()
+        if self._history is not None:
+            self._history.clear()
 
         # Initialize the position of the ball
         self._ball.stick_on_platform(self._platform_1P.rect, self._platform_2P.rect)
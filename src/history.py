@@ -0,0 +1,90 @@
+import numpy as np
+
+HISTORY_FIELDS = (
+    "frame",
+    "ball_x", "ball_y",
+    "ball_speed_x", "ball_speed_y",
+    "ball_speed_dx", "ball_speed_dy",
+    "platform_1P_x", "platform_1P_y",
+    "platform_2P_x", "platform_2P_y",
+    "blocker_x", "blocker_y",
+    "blocker_vx", "blocker_vy",
+)
+_FRAME = HISTORY_FIELDS.index("frame")
+_BALL_SPEED_X = HISTORY_FIELDS.index("ball_speed_x")
+_BALL_SPEED_Y = HISTORY_FIELDS.index("ball_speed_y")
+
+
+class ObservationHistory:
+    """
+    Ring buffer of the last `length` observations, one row per frame in `HISTORY_FIELDS` order
+
+    Every row is written twice, `length` rows apart, so that the last `length` rows
+    are always contiguous and in time order, and `view()` never copies.
+    """
+
+    def __init__(self, length: int):
+        self._length = length
+        self._buffer = np.zeros((2 * length, len(HISTORY_FIELDS)), dtype=np.int64)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        self._next = 0
+        self._count = 0
+
+    def push(self, scene_info: dict, blocker_speed=(0, 0)):
+        """
+        Append the observation of the current frame
+
+        The ball speed deltas are computed against the previous frame, and are 0
+        if the previous frame is missing (the first frame, or a skipped rally).
+        An observation of the same frame as the last one is not appended again.
+
+        @param blocker_speed The speed of the blocker, which can't be told from
+               its positions when it is put back into the play area
+        """
+        frame = scene_info["frame"]
+        ball_x, ball_y = scene_info["ball"]
+        speed_x, speed_y = scene_info["ball_speed"]
+        blocker_x, blocker_y = scene_info["blocker"]
+        blocker_vx, blocker_vy = blocker_speed
+
+        speed_dx = speed_dy = 0
+        if self._count:
+            last = self._buffer[self._next - 1 + self._length]
+            if last[_FRAME] == frame:
+                return
+            if last[_FRAME] == frame - 1:
+                speed_dx, speed_dy = speed_x - last[_BALL_SPEED_X], speed_y - last[_BALL_SPEED_Y]
+
+        row = (
+            frame,
+            ball_x, ball_y,
+            speed_x, speed_y,
+            speed_dx, speed_dy,
+            *scene_info["platform_1P"],
+            *scene_info["platform_2P"],
+            blocker_x, blocker_y,
+            blocker_vx, blocker_vy,
+        )
+        self._buffer[self._next] = row
+        self._buffer[self._next + self._length] = row
+
+        self._next = (self._next + 1) % self._length
+        self._count = min(self._count + 1, self._length)
+
+    def view(self) -> np.ndarray:
+        """
+        Get the stored observations from the oldest to the latest as a read-only view
+
+        The view is only valid until the next `push()`, which overwrites the buffer.
+        Agents in another process get a copy, as `scene_info` is pickled for them.
+        """
+        end = self._next + self._length
+        view = self._buffer[end - self._count:end]
+        view.flags.writeable = False
+        return view
@@ -0,0 +1,4 @@
+import sys
+from os import path
+
+sys.path.append(path.join(path.dirname(__file__), ".."))
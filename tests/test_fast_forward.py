@@ -0,0 +1,73 @@
+import random
+
+from mlgame.utils.enum import get_ai_name
+
+from src.game import PingPong
+
+
+def catch_ball(scene_info, side):
+    """
+    A deterministic bot which only looks at the current `scene_info`,
+    moving to where the ball lands, or to the middle while the ball goes away
+    """
+    if not scene_info["ball_served"]:
+        return "SERVE_TO_LEFT"
+
+    ball_x, ball_y = scene_info["ball"]
+    speed_x, speed_y = scene_info["ball_speed"]
+    target_x = 80
+    if (side == "1P" and speed_y > 0) or (side == "2P" and speed_y < 0):
+        landing_x = ball_x + speed_x * ((410 if side == "1P" else 80) - ball_y) / speed_y
+        landing_x %= 380
+        target_x = (380 - landing_x if landing_x > 190 else landing_x) - 15
+
+    platform_x = scene_info["platform_" + side][0]
+    if platform_x < target_x - 2:
+        return "MOVE_RIGHT"
+    if platform_x > target_x + 2:
+        return "MOVE_LEFT"
+    return "NONE"
+
+
+def play(seed, fast_forward, **params):
+    """
+    Play a game the way mlgame does
+
+    @return The game result and the number of updates of each rally
+    """
+    random.seed(seed)
+    game = PingPong(fast_forward=fast_forward, **params)
+    updates = [0]
+    while True:
+        scene_info = game.get_data_from_game_to_player()[get_ai_name(0)]
+        result = game.update({get_ai_name(0): catch_ball(scene_info, "1P"),
+                              get_ai_name(1): catch_ball(scene_info, "2P")})
+        updates[-1] += 1
+        if result == "QUIT":
+            return game.get_game_result(), updates
+        if result == "RESET":
+            game.reset()
+            updates.append(0)
+
+
+def test_same_result_as_full_simulation():
+    for seed, params in enumerate((
+            {"difficulty": "NORMAL", "game_over_score": 3, "init_vel": 7},
+            {"difficulty": "NORMAL", "game_over_score": 5, "init_vel": 20},
+            {"difficulty": "HARD", "game_over_score": 5, "init_vel": 7},
+            {"difficulty": "HARD", "game_over_score": 15, "init_vel": 30},
+    )):
+        full_result, _ = play(seed, False, **params)
+        fast_result, _ = play(seed, True, **params)
+        assert fast_result == full_result
+
+
+def test_skips_from_the_third_rally():
+    params = {"difficulty": "NORMAL", "game_over_score": 5, "init_vel": 7}
+    _, full_updates = play(0, False, **params)
+    _, fast_updates = play(0, True, **params)
+
+    assert len(fast_updates) == len(full_updates) > 3
+    # Rallies served from the same side repeat, so only the first two are played
+    assert fast_updates[:2] == full_updates[:2]
+    assert fast_updates[2:] == [1] * (len(fast_updates) - 2)
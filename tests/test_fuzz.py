@@ -0,0 +1,60 @@
+import subprocess
+import sys
+from os import path
+
+from mlgame.game.paia_game import GameStatus
+
+from src.fuzz import make_case, run_case, shrink
+from src.game import PingPong, DRAW_BALL_SPEED
+
+
+class LateDrawPingPong(PingPong):
+    """
+    `PingPong` which doesn't call a draw until the ball is one step faster
+    """
+
+    def get_game_status(self):
+        status = super().get_game_status()
+        if (status == GameStatus.GAME_DRAW and
+                abs(min(self._ball.speed, key=abs)) <= DRAW_BALL_SPEED + 1):
+            self._game_status = status = GameStatus.GAME_ALIVE
+        return status
+
+
+def test_same_engine_never_diverges():
+    for seed in range(20):
+        assert make_case(seed, 1000, PingPong)[2] is None
+
+
+def test_late_draw_is_caught_and_shrunk():
+    for seed in range(50):
+        params, commands, divergence = make_case(seed, 1000, LateDrawPingPong)
+        if divergence is not None:
+            break
+    assert divergence is not None
+    assert divergence[1]["update_result"] == ("'RESET'", "None")
+
+    commands, divergence = shrink(LateDrawPingPong, seed, params, commands, divergence)
+    assert len(commands) == divergence[0]
+    assert run_case(LateDrawPingPong, seed, params, commands) == divergence
+
+
+def test_cli_output_can_be_replayed(tmp_path):
+    root = path.join(path.dirname(__file__), "..")
+    fuzz = subprocess.run(
+        [sys.executable, "-m", "src.fuzz", "--engine", "tests.test_fuzz:LateDrawPingPong",
+         "--cases", "100", "--max-failures", "1", "--jobs", "1"],
+        cwd=root, capture_output=True, text=True)
+    assert fuzz.returncode == 1
+    lines = fuzz.stdout.splitlines()
+    assert len(lines) == 1
+    assert all(line.startswith("{") for line in lines)
+
+    repros = tmp_path / "repros.jsonl"
+    repros.write_text("not a repro\n\n" + fuzz.stdout)
+    replay = subprocess.run([sys.executable, "-m", "src.fuzz", "--replay", str(repros)],
+                            cwd=root, capture_output=True, text=True)
+    assert replay.returncode == 0
+    results = replay.stdout.splitlines()
+    assert len(results) == 1
+    assert all(not result.endswith(": OK") for result in results)
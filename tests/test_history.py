@@ -0,0 +1,74 @@
+import numpy as np
+from mlgame.utils.enum import get_ai_name
+
+from src.game import PingPong
+from src.history import HISTORY_FIELDS, ObservationHistory
+
+
+def make_scene_info(frame):
+    return {
+        "frame": frame,
+        "ball": (frame, 2 * frame),
+        "ball_speed": (frame // 3, -(frame // 3)),
+        "platform_1P": (frame % 7, 420),
+        "platform_2P": (frame % 11, 70),
+        "blocker": (frame % 13, 240),
+    }
+
+
+def make_row(frame, last_frame=None):
+    speed_dx = speed_dy = 0
+    if last_frame == frame - 1:
+        speed_dx = frame // 3 - last_frame // 3
+        speed_dy = -speed_dx
+    return [frame, frame, 2 * frame, frame // 3, -(frame // 3), speed_dx, speed_dy,
+            frame % 7, 420, frame % 11, 70, frame % 13, 240, 5, 0]
+
+
+def test_keeps_last_rows_in_order():
+    history = ObservationHistory(4)
+    expected = []
+    for frame in range(11):
+        history.push(make_scene_info(frame), (5, 0))
+        expected.append(make_row(frame, frame - 1 if frame else None))
+
+        view = history.view()
+        assert view.tolist() == expected[-4:]
+        assert view.flags.c_contiguous
+        assert not view.flags.writeable
+        assert np.shares_memory(view, history._buffer)
+
+    assert len(history) == 4
+    assert len(HISTORY_FIELDS) == len(expected[0])
+
+
+def test_same_frame_is_pushed_once():
+    history = ObservationHistory(3)
+    history.push(make_scene_info(0), (5, 0))
+    history.push(make_scene_info(1), (5, 0))
+    history.push(make_scene_info(1), (5, 0))
+
+    assert history.view().tolist() == [make_row(0), make_row(1, 0)]
+
+
+def test_missing_frames_have_no_speed_delta():
+    history = ObservationHistory(3)
+    history.push(make_scene_info(5), (5, 0))
+    history.push(make_scene_info(9), (5, 0))
+
+    assert history.view().tolist() == [make_row(5), make_row(9)]
+
+
+def test_cleared_on_reset():
+    game = PingPong("HARD", 3, history_len=5)
+    commands = {get_ai_name(0): "SERVE_TO_LEFT", get_ai_name(1): "NONE"}
+    result = None
+    while result != "RESET":
+        history = game.get_data_from_game_to_player()[get_ai_name(0)]["history"]
+        assert set(history[:, HISTORY_FIELDS.index("blocker_vx")]) <= {-5, 5}
+        result = game.update(commands)
+    game.reset()
+
+    history = game.get_data_from_game_to_player()[get_ai_name(0)]["history"]
+    assert history[:, 0].tolist() == [0]
+    assert history[0, HISTORY_FIELDS.index("ball_speed_dx")] == 0